@@ -9,53 +9,41 @@ import argparse
 import asyncio
 import sys
 import os
+from contextlib import nullcontext
 from typing import Optional
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.providers.base import ProviderConfig
-from src.providers.maritaca import MaritacaProvider
-from src.providers.openai_provider import OpenAIProvider
-from src.providers.ollama import OllamaProvider
-from src.providers.bedrock import BedrockProvider
+from src.providers.factory import ProviderFactory
 from src.dataset.loader import DatasetLoader
 from src.evaluation.evaluator import Evaluator
+from src.evaluation.cache import ResponseCache
 from src.reports.generator import ReportGenerator
 
 
+# CLI provider names that differ from the factory's provider types
+PROVIDER_TYPES = {"bedrock": "aws_bedrock"}
+
+
 def get_provider(args):
     """Get the appropriate provider based on arguments"""
-    
-    # Create provider config
-    config = ProviderConfig(
+    return ProviderFactory.create(
+        PROVIDER_TYPES.get(args.provider, args.provider),
         model_name=args.model,
-        temperature=args.temperature,
-        max_tokens=args.max_tokens,
         api_key=args.api_key,
         base_url=args.base_url,
-        timeout=args.timeout
+        temperature=args.temperature,
+        max_tokens=args.max_tokens,
+        timeout=args.timeout,
+        max_connections=2 * args.parallelism,
+        # Bedrock requires additional AWS credentials; ignored by other providers
+        aws_access_key_id=args.aws_access_key_id,
+        aws_secret_access_key=args.aws_secret_access_key,
+        aws_session_token=args.aws_session_token,
+        aws_bearer_token=args.aws_bearer_token,
+        region_name=args.aws_region
     )
-    
-    # Select provider based on provider type
-    if args.provider == "maritaca":
-        return MaritacaProvider(config)
-    elif args.provider == "openai":
-        return OpenAIProvider(config)
-    elif args.provider == "ollama":
-        return OllamaProvider(config)
-    elif args.provider == "bedrock":
-        # Bedrock requires additional AWS credentials
-        return BedrockProvider(
-            config,
-            aws_access_key_id=args.aws_access_key_id,
-            aws_secret_access_key=args.aws_secret_access_key,
-            aws_session_token=args.aws_session_token,
-            aws_bearer_token=args.aws_bearer_token,
-            region_name=args.aws_region
-        )
-    else:
-        raise ValueError(f"Provider não suportado: {args.provider}")
 
 
 async def main():
@@ -95,17 +83,50 @@ async def main():
         default="benchmark_perguntas_unificado.json",
         help="Caminho do JSON do benchmark"
     )
+    parser.add_argument(
+        "--dataset_cache",
+        action="store_true",
+        help="Reutilizar o dataset processado em <dataset>.cache.pkl (só para diretórios confiáveis)"
+    )
     parser.add_argument("--limit", type=int, help="Limitar número de perguntas")
     parser.add_argument("--parallelism", type=int, default=10, help="Número de chamadas paralelas")
+    parser.add_argument("--cache_path", help="Arquivo SQLite para cache de respostas (opcional)")
+    parser.add_argument("--rpm", type=float, help="Limite de requisições por minuto ao provider")
+    parser.add_argument(
+        "--prompt_batch_size",
+        type=int,
+        default=1,
+        help="Número de perguntas enviadas juntas em uma única chamada"
+    )
     
     # Output
     parser.add_argument("--csv_out", default="resultados_avaliacao.csv", help="Arquivo CSV de saída")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet", "feather"],
+        default="csv",
+        help="Formato do arquivo de resultados (parquet/feather usam o nome do --csv_out com outra extensão)"
+    )
+    parser.add_argument(
+        "--compact_csv",
+        action="store_true",
+        help="CSV só com arquivo, titulo, idx_local e correta (sem os textos)"
+    )
     parser.add_argument("--detailed_report", action="store_true", help="Gerar relatório detalhado JSON")
     parser.add_argument("--html_report", action="store_true", help="Gerar relatório HTML")
+    parser.add_argument(
+        "--compress_reports",
+        action="store_true",
+        help="Gravar os relatórios JSON/HTML com gzip (.gz)"
+    )
     parser.add_argument("--no_progress", action="store_true", help="Desabilitar barra de progresso")
     
     args = parser.parse_args()
     
+    # The compact layout only exists for the CSV writers
+    if args.compact_csv and args.format != "csv":
+        parser.error("--compact_csv só pode ser usado com --format csv")
+    
     # Validate required arguments for specific providers
     if args.provider in ["maritaca", "openai"] and not args.api_key:
         print(f"Erro: --api_key é obrigatório para o provider {args.provider}")
@@ -118,39 +139,69 @@ async def main():
     try:
         # Load dataset
         print(f"Carregando dataset de {args.dataset_path}...")
-        dataset = DatasetLoader.load_dataset(args.dataset_path)
+        dataset = DatasetLoader.load_dataset(
+            args.dataset_path, limit=args.limit, use_cache=args.dataset_cache
+        )
         print(f"Dataset carregado: {len(dataset)} perguntas")
         
         # Get provider
         print(f"Inicializando provider {args.provider}...")
         provider = get_provider(args)
         
+        # Reuse responses from previous runs when a cache is given
+        cache = ResponseCache(args.cache_path) if args.cache_path else None
+        
         # Create evaluator
-        evaluator = Evaluator(provider, parallelism=args.parallelism)
+        evaluator = Evaluator(
+            provider,
+            parallelism=args.parallelism,
+            prompt_batch_size=args.prompt_batch_size,
+            rpm=args.rpm,
+            cache=cache
+        )
+        
+        # Stream CSV rows to disk as each question completes, so an interrupted
+        # run keeps what it already answered; rows are in completion order
+        stream_csv = args.format == "csv"
+        csv_stream = ReportGenerator(
+            output_path=args.csv_out, keep_results=False, compact_csv=args.compact_csv
+        )
         
         # Run evaluation
         print("Iniciando avaliação...")
-        results = await evaluator.evaluate(
-            dataset,
-            limit=args.limit,
-            show_progress=not args.no_progress
-        )
+        try:
+            with csv_stream if stream_csv else nullcontext():
+                results = await evaluator.evaluate(
+                    dataset,
+                    limit=args.limit,
+                    show_progress=not args.no_progress,
+                    on_result=csv_stream.add_result if stream_csv else None
+                )
+        finally:
+            await provider.aclose()
+            if cache:
+                cache.close()
         
-        # Generate reports
-        print("\nGerando relatórios...")
+        # Every other output is built from the returned results, in dataset order
         report_gen = ReportGenerator(output_path=args.csv_out)
         report_gen.add_results(results)
         
-        # Save CSV
-        report_gen.save_csv()
+        # Generate reports
+        print("\nGerando relatórios...")
+        
+        # Columnar formats are written once all results are in
+        if args.format == "parquet":
+            report_gen.save_parquet()
+        elif args.format == "feather":
+            report_gen.save_feather()
         
         # Save detailed report if requested
         if args.detailed_report:
-            report_gen.save_detailed_report()
+            report_gen.save_detailed_report(compress=args.compress_reports)
         
         # Save HTML report if requested
         if args.html_report:
-            report_gen.save_html_report(model_name=args.model)
+            report_gen.save_html_report(model_name=args.model, compress=args.compress_reports)
         
         # Print summary
         report_gen.print_summary(model_name=args.model)
@@ -9,10 +9,10 @@ import argparse
 import asyncio
 import sys
 import os
-import json
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence
 import pandas as pd
 
 # Add src to path
@@ -22,23 +22,42 @@ from src.config.loader import ConfigLoader, ProviderConfigItem
 from src.providers.factory import ProviderFactory
 from src.dataset.loader import DatasetLoader
 from src.evaluation.evaluator import Evaluator
+from src.evaluation.cache import ResponseCache
 from src.reports.generator import ReportGenerator
+from src.utils.json_io import dump_json
 
 
 class BatchEvaluator:
     """Batch evaluator for multiple providers"""
     
-    def __init__(self, config_path: str = "providers.json"):
+    def __init__(self, config_path: str = "providers.json", cache_path: Optional[str] = None):
         self.config_loader = ConfigLoader(config_path)
         self.results = {}
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._summary_df: Optional[pd.DataFrame] = None
+        # Shared by all providers; keys include the provider and model
+        self.cache = ResponseCache(cache_path) if cache_path else None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Release resources held across providers"""
+        await ProviderFactory.aclose_all()
+        if self.cache:
+            self.cache.close()
+            self.cache = None
     
     async def evaluate_provider(
         self,
         provider_config: ProviderConfigItem,
-        dataset: List[Any],
+        dataset: Sequence[Any],
         limit: Optional[int] = None,
-        show_progress: bool = True
+        show_progress: bool = True,
+        progress_position: Optional[int] = None
     ) -> Dict:
         """Evaluate a single provider"""
         
@@ -63,13 +82,24 @@ class BatchEvaluator:
                     'results': []
                 }
             
-            # Create provider instance
-            provider = ProviderFactory.create_from_config(provider_config)
+            parallelism = self.config_loader.default_settings.parallelism
+            
+            # Reuse the provider (and its connection pool) across evaluations;
+            # clients are closed when the BatchEvaluator context exits
+            provider = ProviderFactory.get_or_create(
+                provider_config,
+                max_connections=2 * parallelism
+            )
             
             # Create evaluator
             evaluator = Evaluator(
-                provider, 
-                parallelism=self.config_loader.default_settings.parallelism
+                provider,
+                parallelism=parallelism,
+                prompt_batch_size=self.config_loader.default_settings.prompt_batch_size,
+                rpm=provider_config.rpm,
+                progress_label=provider_config.name,
+                progress_position=progress_position,
+                cache=self.cache
             )
             
             # Run evaluation
@@ -106,13 +136,14 @@ class BatchEvaluator:
         dataset_path: str,
         providers: Optional[List[str]] = None,
         limit: Optional[int] = None,
-        show_progress: bool = True
+        show_progress: bool = True,
+        dataset_cache: bool = False
     ):
         """Evaluate all providers"""
         
         # Load dataset
         print(f"Loading dataset from {dataset_path}...")
-        dataset = DatasetLoader.load_dataset(dataset_path)
+        dataset = DatasetLoader.load_dataset(dataset_path, limit=limit, use_cache=dataset_cache)
         print(f"Dataset loaded: {len(dataset)} questions\n")
         
         # Select providers to evaluate
@@ -137,17 +168,24 @@ class BatchEvaluator:
         for p in selected_providers:
             print(f"  - {p.name} ({p.type}: {p.model})")
         
-        # Evaluate each provider
-        for provider_config in selected_providers:
-            result = await self.evaluate_provider(
+        # Providers are independent endpoints, so evaluate them concurrently;
+        # each one gets its own progress bar row
+        tasks = [
+            asyncio.create_task(self.evaluate_provider(
                 provider_config,
                 dataset,
                 limit=limit,
-                show_progress=show_progress
-            )
+                show_progress=show_progress,
+                progress_position=position
+            ))
+            for position, provider_config in enumerate(selected_providers)
+        ]
+        results = await asyncio.gather(*tasks)
+        
+        for provider_config, result in zip(selected_providers, results):
             self.results[provider_config.name] = result
     
-    def save_results(self, output_dir: str = "evaluation_results"):
+    def save_results(self, output_dir: str = "evaluation_results", compact_csv: bool = False):
         """Save evaluation results"""
         
         output_path = Path(output_dir)
@@ -162,7 +200,7 @@ class BatchEvaluator:
             if result['status'] == 'completed' and result['results']:
                 # Save CSV
                 csv_path = run_dir / f"{provider_name.replace(' ', '_')}_results.csv"
-                report_gen = ReportGenerator(output_path=str(csv_path))
+                report_gen = ReportGenerator(output_path=str(csv_path), compact_csv=compact_csv)
                 report_gen.add_results(result['results'])
                 report_gen.save_csv()
                 
@@ -191,8 +229,7 @@ class BatchEvaluator:
         }
         
         metadata_path = run_dir / "run_metadata.json"
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        dump_json(metadata, metadata_path)
         
         print(f"\n📁 All results saved to: {run_dir}")
         
@@ -205,34 +242,28 @@ class BatchEvaluator:
         
         for provider_name, result in self.results.items():
             if result['status'] == 'completed' and result['results']:
-                # Calculate metrics
-                total = len(result['results'])
-                correct = sum(1 for r in result['results'] if r.get('correct', False))
-                accuracy = (correct / total * 100) if total > 0 else 0
+                # One DataFrame per provider; aggregation runs in pandas
+                df = pd.DataFrame(result['results'])
+                scored = df[~df['falha_infra']]
+                total = len(df)
+                correct = int(scored['correta'].sum())
+                accuracy = (correct / len(scored) * 100) if len(scored) > 0 else 0
                 
-                # Calculate per-category accuracy
-                category_stats = {}
-                for r in result['results']:
-                    cat = r.get('category', 'Unknown')
-                    if cat not in category_stats:
-                        category_stats[cat] = {'total': 0, 'correct': 0}
-                    category_stats[cat]['total'] += 1
-                    if r.get('correct', False):
-                        category_stats[cat]['correct'] += 1
+                # Per-category (titulo) accuracy
+                category_stats = scored.groupby('titulo', sort=False)['correta'].agg(
+                    total='count', correct='sum'
+                )
+                category_accuracy = (category_stats['correct'] / category_stats['total'] * 100).round(2)
                 
                 summary_data.append({
                     'Provider': provider_name,
                     'Model': result['model'],
                     'Type': result['type'],
                     'Total Questions': total,
+                    'Infra Failures': total - len(scored),
                     'Correct': correct,
                     'Accuracy (%)': round(accuracy, 2),
-                    **{
-                        f'{cat} Accuracy (%)': round(
-                            stats['correct'] / stats['total'] * 100, 2
-                        ) if stats['total'] > 0 else 0
-                        for cat, stats in category_stats.items()
-                    }
+                    **category_accuracy.add_suffix(' Accuracy (%)').to_dict()
                 })
             else:
                 summary_data.append({
@@ -245,6 +276,7 @@ class BatchEvaluator:
         # Save as CSV
         if summary_data:
             df = pd.DataFrame(summary_data)
+            self._summary_df = df
             csv_path = output_dir / "combined_summary.csv"
             df.to_csv(csv_path, index=False, encoding='utf-8')
             print(f"✅ Saved combined summary to {csv_path}")
@@ -263,16 +295,31 @@ class BatchEvaluator:
         print("BATCH EVALUATION COMPLETE")
         print("="*60)
         
+        # Reuse the counts computed by save_combined_summary instead of re-walking results
+        summary = {}
+        if self._summary_df is not None:
+            summary = self._summary_df.set_index('Provider').to_dict('index')
+        
         for provider_name, result in self.results.items():
             print(f"\n{provider_name}:")
             print(f"  Status: {result['status']}")
             
             if result['status'] == 'completed' and result['results']:
-                total = len(result['results'])
-                correct = sum(1 for r in result['results'] if r.get('correct', False))
-                accuracy = (correct / total * 100) if total > 0 else 0
+                row = summary.get(provider_name)
+                if row is not None:
+                    total = int(row['Total Questions'])
+                    infra_failures = int(row['Infra Failures'])
+                    correct = int(row['Correct'])
+                    accuracy = row['Accuracy (%)']
+                else:
+                    total = len(result['results'])
+                    infra_failures = sum(map(attrgetter('falha_infra'), result['results']))
+                    correct = sum(map(attrgetter('correta'), result['results']))
+                    scored = total - infra_failures
+                    accuracy = (correct / scored * 100) if scored > 0 else 0
                 
                 print(f"  Total Questions: {total}")
+                print(f"  Infra Failures: {infra_failures}")
                 print(f"  Correct: {correct}")
                 print(f"  Accuracy: {accuracy:.2f}%")
             elif result['status'] == 'failed':
@@ -297,6 +344,12 @@ async def main():
         help="Path to benchmark dataset"
     )
     
+    parser.add_argument(
+        "--dataset-cache",
+        action="store_true",
+        help="Reuse the parsed dataset from <dataset>.cache.pkl (trusted directories only)"
+    )
+    
     parser.add_argument(
         "--providers",
         nargs="+",
@@ -315,6 +368,17 @@ async def main():
         help="Directory to save results"
     )
     
+    parser.add_argument(
+        "--cache-path",
+        help="SQLite file used to cache provider responses across runs"
+    )
+    
+    parser.add_argument(
+        "--compact-csv",
+        action="store_true",
+        help="Write per-provider CSVs with only arquivo, titulo, idx_local and correta"
+    )
+    
     parser.add_argument(
         "--no-progress",
         action="store_true",
@@ -325,21 +389,21 @@ async def main():
     
     try:
         # Create batch evaluator
-        evaluator = BatchEvaluator(args.config)
-        
-        # Run evaluations
-        await evaluator.evaluate_all(
-            dataset_path=args.dataset,
-            providers=args.providers,
-            limit=args.limit,
-            show_progress=not args.no_progress
-        )
-        
-        # Save results
-        evaluator.save_results(args.output_dir)
-        
-        # Print summary
-        evaluator.print_summary()
+        async with BatchEvaluator(args.config, cache_path=args.cache_path) as evaluator:
+            # Run evaluations
+            await evaluator.evaluate_all(
+                dataset_path=args.dataset,
+                providers=args.providers,
+                limit=args.limit,
+                show_progress=not args.no_progress,
+                dataset_cache=args.dataset_cache
+            )
+            
+            # Save results
+            evaluator.save_results(args.output_dir, compact_csv=args.compact_csv)
+            
+            # Print summary
+            evaluator.print_summary()
         
     except FileNotFoundError as e:
         print(f"❌ Error: {e}")
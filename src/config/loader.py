@@ -1,11 +1,21 @@
 """Configuration loader for providers"""
 
-import json
 import os
 import re
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from dataclasses import dataclass, field
+from src.utils.json_io import load_json
+
+
+# Matches ${VAR_NAME} placeholders in configuration values
+_ENV_RE = re.compile(r'\$\{([^}]+)\}')
+
+# Provider keys mapped to ProviderConfigItem fields; anything else goes to extra_params
+_KNOWN_PROVIDER_KEYS = frozenset({
+    'name', 'type', 'model', 'api_key', 'base_url',
+    'region', 'aws_bearer_token', 'temperature', 'max_tokens', 'timeout', 'rpm', 'active'
+})
 
 
 @dataclass
@@ -21,6 +31,7 @@ class ProviderConfigItem:
     temperature: float = 0.0
     max_tokens: int = 12000
     timeout: int = 120
+    rpm: Optional[float] = None  # Requests-per-minute cap; None disables throttling
     extra_params: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -31,6 +42,8 @@ class ConfigSettings:
     max_tokens: int = 12000
     timeout: int = 120
     parallelism: int = 10
+    prompt_batch_size: int = 1
+    rpm: Optional[float] = None
 
 
 class ConfigLoader:
@@ -40,22 +53,16 @@ class ConfigLoader:
         self.config_path = Path(config_path)
         self.providers: List[ProviderConfigItem] = []
         self.default_settings: ConfigSettings = ConfigSettings()
+        self._by_name: Dict[str, ProviderConfigItem] = {}
+        self._by_type: Dict[str, List[ProviderConfigItem]] = {}
         self._load_config()
     
     def _substitute_env_vars(self, value: Any) -> Any:
         """Substitute environment variables in configuration values"""
         if isinstance(value, str):
-            # Find all ${VAR_NAME} patterns
-            pattern = r'\$\{([^}]+)\}'
-            matches = re.findall(pattern, value)
-            
-            for var_name in matches:
-                env_value = os.environ.get(var_name)
-                if env_value:
-                    value = value.replace(f'${{{var_name}}}', env_value)
-                else:
-                    # Keep the placeholder if env var not found
-                    pass
+            # Replace every ${VAR_NAME} in one pass, keeping the placeholder
+            # if the env var is not set (or empty)
+            value = _ENV_RE.sub(lambda m: os.environ.get(m.group(1)) or m.group(0), value)
             
             # Return None if the value is still a placeholder
             if value.startswith('${') and value.endswith('}'):
@@ -64,28 +71,26 @@ class ConfigLoader:
         return value
     
     def _process_config_dict(self, config_dict: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a configuration dictionary to substitute env vars"""
-        processed = {}
-        for key, value in config_dict.items():
-            if isinstance(value, dict):
-                processed[key] = self._process_config_dict(value)
-            elif isinstance(value, list):
-                processed[key] = [
-                    self._process_config_dict(item) if isinstance(item, dict) 
-                    else self._substitute_env_vars(item) 
-                    for item in value
-                ]
-            else:
-                processed[key] = self._substitute_env_vars(value)
-        return processed
+        """Substitute env vars in place across nested dicts/lists"""
+        stack: List[Any] = [config_dict]
+        while stack:
+            container = stack.pop()
+            entries = container.items() if isinstance(container, dict) else enumerate(container)
+            for key, value in entries:
+                if isinstance(value, (dict, list)):
+                    stack.append(value)
+                elif isinstance(value, str) and '${' in value:
+                    # Only strings with a placeholder go through the regex;
+                    # assigning to an existing key/index is safe mid-iteration
+                    container[key] = self._substitute_env_vars(value)
+        return config_dict
     
     def _load_config(self):
         """Load configuration from JSON file"""
         if not self.config_path.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
         
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            config_data = json.load(f)
+        config_data = load_json(self.config_path)
         
         # Process environment variables
         config_data = self._process_config_dict(config_data)
@@ -97,7 +102,9 @@ class ConfigLoader:
                 temperature=settings.get('temperature', 0.0),
                 max_tokens=settings.get('max_tokens', 12000),
                 timeout=settings.get('timeout', 120),
-                parallelism=settings.get('parallelism', 10)
+                parallelism=settings.get('parallelism', 10),
+                prompt_batch_size=settings.get('prompt_batch_size', 1),
+                rpm=settings.get('rpm')
             )
         
         # Load providers
@@ -116,30 +123,29 @@ class ConfigLoader:
                 aws_bearer_token=provider_data.get('aws_bearer_token'),
                 temperature=provider_data.get('temperature', self.default_settings.temperature),
                 max_tokens=provider_data.get('max_tokens', self.default_settings.max_tokens),
-                timeout=provider_data.get('timeout', self.default_settings.timeout)
+                timeout=provider_data.get('timeout', self.default_settings.timeout),
+                rpm=provider_data.get('rpm', self.default_settings.rpm),
+                # Store any extra parameters
+                extra_params={
+                    key: value for key, value in provider_data.items()
+                    if key not in _KNOWN_PROVIDER_KEYS
+                }
             )
             
-            # Store any extra parameters
-            known_keys = {
-                'name', 'type', 'model', 'api_key', 'base_url', 
-                'region', 'aws_bearer_token', 'temperature', 'max_tokens', 'timeout', 'active'
-            }
-            for key, value in provider_data.items():
-                if key not in known_keys:
-                    provider_config.extra_params[key] = value
-            
             self.providers.append(provider_config)
+        
+        # Index providers for constant-time lookups; the first entry wins on duplicate names
+        for provider in self.providers:
+            self._by_name.setdefault(provider.name, provider)
+            self._by_type.setdefault(provider.type, []).append(provider)
     
     def get_provider(self, name: str) -> Optional[ProviderConfigItem]:
         """Get a specific provider configuration by name"""
-        for provider in self.providers:
-            if provider.name == name:
-                return provider
-        return None
+        return self._by_name.get(name)
     
     def get_providers_by_type(self, provider_type: str) -> List[ProviderConfigItem]:
         """Get all providers of a specific type"""
-        return [p for p in self.providers if p.type == provider_type]
+        return list(self._by_type.get(provider_type, []))
     
     def list_providers(self) -> List[str]:
         """List all available provider names"""
@@ -1,13 +1,28 @@
 """Dataset loading and parsing module"""
 
-import json
 import os
+import pickle
 import re
-from typing import List, Optional, Tuple
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional, Tuple
 from dataclasses import dataclass
+from src.utils.json_io import load_json
 
+try:
+    import ijson
+except ImportError:
+    # ijson is optional; without it large files are parsed in one go
+    ijson = None
 
-@dataclass
+
+# Bump whenever QAItem or the parsing rules change to invalidate sidecar caches
+DATASET_CACHE_VERSION = 1
+
+# Files above this size are parsed incrementally when ijson is installed
+STREAM_THRESHOLD_BYTES = 5 * 1024 * 1024
+
+
+@dataclass(slots=True)
 class QAItem:
     """Data class for question-answer items"""
     arquivo: str
@@ -21,44 +36,103 @@ class DatasetLoader:
     """Handles dataset loading and parsing"""
     
     @staticmethod
-    def load_dataset(path: str) -> List[QAItem]:
+    def iter_blocks(path: str) -> Iterator[Dict[str, Any]]:
         """
-        Load dataset from JSON file
+        Yield the top-level blocks of the dataset JSON
+        
+        Large files are read with ijson, one block at a time, so the whole
+        document is never held in memory; small files keep the faster
+        single-pass parser.
+        """
+        if ijson is not None and os.path.getsize(path) > STREAM_THRESHOLD_BYTES:
+            with open(path, "rb") as f:
+                yield from ijson.items(f, "item")
+        else:
+            yield from load_json(path)
+    
+    @staticmethod
+    def iter_dataset(path: str) -> Iterator[QAItem]:
+        """
+        Yield QAItems from a JSON file one at a time
         
         Args:
             path: Path to the JSON file
             
-        Returns:
-            List of QAItem objects
+        Yields:
+            QAItem objects in dataset order
         """
         if not os.path.exists(path):
             raise FileNotFoundError(f"Arquivo não encontrado: {path}")
         
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # Local binding keeps the global lookup out of the per-item loop
+        qa_item = QAItem
         
-        items: List[QAItem] = []
-        for bloco in data:
+        for bloco in DatasetLoader.iter_blocks(path):
             arquivo = bloco.get("arquivo", "")
             titulo = bloco.get("titulo", "")
-            perguntas = bloco.get("perguntas", [])
+            perguntas = bloco.get("perguntas", ())
             
-            # Process questions in pairs (True, False)
-            for i in range(0, len(perguntas) - 1, 2):
-                items.append(QAItem(
-                    arquivo=arquivo,
-                    titulo=titulo,
-                    pergunta=perguntas[i],
-                    esperado="Verdadeiro",
-                    idx_local=i
-                ))
-                items.append(QAItem(
-                    arquivo=arquivo,
-                    titulo=titulo,
-                    pergunta=perguntas[i + 1],
-                    esperado="Falso",
-                    idx_local=i + 1
-                ))
+            # Process questions in pairs (True, False); a trailing odd one is skipped
+            for i in range(0, len(perguntas) & ~1, 2):
+                yield qa_item(arquivo, titulo, perguntas[i], "Verdadeiro", i)
+                yield qa_item(arquivo, titulo, perguntas[i + 1], "Falso", i + 1)
+    
+    @staticmethod
+    def _read_cache(cache_path: str, header: Tuple) -> Optional[Tuple[QAItem, ...]]:
+        """Return cached items if the sidecar matches header, else None"""
+        try:
+            with open(cache_path, "rb") as f:
+                cached_header, items = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError):
+            return None
+        return items if cached_header == header else None
+    
+    @staticmethod
+    def _write_cache(cache_path: str, header: Tuple, items: Tuple[QAItem, ...]):
+        """Write the sidecar cache atomically; failures (e.g. read-only dir) are ignored"""
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((header, items), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    @staticmethod
+    def load_dataset(path: str, limit: Optional[int] = None, use_cache: bool = False) -> Tuple[QAItem, ...]:
+        """
+        Load dataset from JSON file
+        
+        Args:
+            path: Path to the JSON file
+            limit: Optional maximum number of items to return
+            use_cache: Reuse/write the parsed items in a '<path>.cache.pkl' sidecar.
+                       The sidecar is unpickled, so only enable this for datasets
+                       in directories no one else can write to
+            
+        Returns:
+            Immutable tuple of QAItem objects, safe to share across evaluators
+        """
+        # Fail on a missing file here rather than on first iteration
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+        
+        if not use_cache or limit:
+            # No QAItems are built past the limit
+            return tuple(islice(DatasetLoader.iter_dataset(path), limit))
+        
+        # The cache is only valid for this exact file contents and loader version
+        stat = os.stat(path)
+        header = (DATASET_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+        cache_path = f"{path}.cache.pkl"
+        
+        items = DatasetLoader._read_cache(cache_path, header)
+        if items is None:
+            items = tuple(DatasetLoader.iter_dataset(path))
+            DatasetLoader._write_cache(cache_path, header, items)
         
         return items
 
@@ -67,6 +141,45 @@ class ResponseParser:
     """Handles response parsing and label extraction"""
     
     VER_REGEX = re.compile(r"\b(verdadeiro|falso)\b", re.IGNORECASE)
+    BATCH_REGEX = re.compile(r"Resposta\s*(\d+)\s*:\s*(verdadeiro|falso)\b", re.IGNORECASE)
+    
+    # The prompt asks for the label on the final line, so only the tail is scanned first
+    TAIL_SIZE = 256
+    FAST_TAIL_SIZE = 128
+    
+    @staticmethod
+    def _is_word_char(ch: str) -> bool:
+        """Same definition of a word character as the regex \\b"""
+        return ch.isalnum() or ch == "_"
+    
+    @classmethod
+    def _parse_label_fast(cls, text: str) -> Optional[str]:
+        """
+        Find the label with plain substring searches on the response tail
+        
+        Returns None whenever the answer is not clear-cut, so the caller can
+        fall back to the regex.
+        """
+        tail = text[-cls.FAST_TAIL_SIZE:].lower()
+        pos_v = tail.rfind("verdadeiro")
+        pos_f = tail.rfind("falso")
+        if pos_v < 0 and pos_f < 0:
+            return None
+        
+        if pos_v > pos_f:
+            label, start, end = "Verdadeiro", pos_v, pos_v + len("verdadeiro")
+        else:
+            label, start, end = "Falso", pos_f, pos_f + len("falso")
+        
+        # Reject hits inside longer words (e.g. 'falsos') and hits at the cut
+        # point, which may be the end of a word that started before the tail
+        if start == 0 and len(text) > len(tail):
+            return None
+        if start > 0 and cls._is_word_char(tail[start - 1]):
+            return None
+        if end < len(tail) and cls._is_word_char(tail[end]):
+            return None
+        return label
     
     @classmethod
     def parse_label_from_response(cls, text: str) -> Optional[str]:
@@ -79,13 +192,53 @@ class ResponseParser:
         Returns:
             'Verdadeiro', 'Falso', or None if not found
         """
-        matches = list(cls.VER_REGEX.finditer(text or ""))
-        if not matches:
+        text = text or ""
+        label = cls._parse_label_fast(text)
+        if label is not None:
+            return label
+        
+        offset = max(len(text) - cls.TAIL_SIZE, 0)
+        last = cls._last_match(text, offset)
+        
+        # Searching from an offset still honours word boundaries at the cut
+        # point; fall back to a full scan only when the tail has no label
+        if last is None and offset:
+            last = cls._last_match(text, 0)
+        if last is None:
             return None
         
-        # Get the last match (reading from the end)
-        last = matches[-1].group(1).strip().lower()
-        return "Verdadeiro" if last.startswith("v") else "Falso"
+        return "Verdadeiro" if last.group(1)[0] in "vV" else "Falso"
+    
+    @classmethod
+    def _last_match(cls, text: str, pos: int) -> Optional[re.Match]:
+        """Last VER_REGEX match starting at pos, without building a list of all matches"""
+        last = None
+        for last in cls.VER_REGEX.finditer(text, pos):
+            pass
+        return last
+    
+    @classmethod
+    def parse_batch_labels(cls, text: str) -> Dict[int, Tuple[str, str]]:
+        """
+        Extract numbered 'Resposta N: Verdadeiro/Falso' labels from a batched response
+        
+        Args:
+            text: Response text from the model
+            
+        Returns:
+            Dict mapping the 1-based question number to its label ('Verdadeiro'
+            or 'Falso') and the response line the label was read from
+        """
+        text = text or ""
+        labels: Dict[int, Tuple[str, str]] = {}
+        for match in cls.BATCH_REGEX.finditer(text):
+            start = text.rfind("\n", 0, match.start()) + 1
+            end = text.find("\n", match.end())
+            line = text[start:end if end >= 0 else len(text)].strip()
+            label = "Verdadeiro" if match.group(2).lower().startswith("v") else "Falso"
+            # Later lines win, matching the single-question "last label" rule
+            labels[int(match.group(1))] = (label, line)
+        return labels
     
     @classmethod
     def validate_response(cls, response: str, expected: str) -> Tuple[Optional[str], bool]:
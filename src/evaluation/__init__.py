@@ -1,5 +1,7 @@
 """Initialize evaluation module"""
 
 from .evaluator import Evaluator
+from .cache import ResponseCache
+from .rate_limiter import AsyncTokenBucket
 
-__all__ = ["Evaluator"]
\ No newline at end of file
+__all__ = ["Evaluator", "ResponseCache", "AsyncTokenBucket"]
\ No newline at end of file
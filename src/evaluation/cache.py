@@ -0,0 +1,51 @@
+"""Disk cache for provider responses"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Optional
+
+
+class ResponseCache:
+    """SQLite-backed cache keyed by a hash of everything that determines a completion"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        # Accessed from worker threads (asyncio.to_thread), serialized by the lock
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+        )
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a content-addressed key from the request parameters"""
+        return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, if any"""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, response: str):
+        """Store a response"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, response) VALUES (?, ?)", (key, response)
+            )
+    
+    async def aget(self, key: str) -> Optional[str]:
+        """Async get that keeps SQLite I/O off the event loop"""
+        return await asyncio.to_thread(self.get, key)
+    
+    async def aset(self, key: str, response: str):
+        """Async set that keeps SQLite I/O off the event loop"""
+        await asyncio.to_thread(self.set, key, response)
+    
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
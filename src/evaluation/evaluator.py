@@ -1,11 +1,22 @@
 """Evaluation module using LangChain"""
 
 import asyncio
-from typing import List, Optional, Dict, Any
+import json
+import logging
+from itertools import islice
+from typing import List, Optional, Dict, Any, Callable, Iterable, Sequence
+import httpx
+import openai
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from tqdm.asyncio import tqdm
 from src.providers.base import BaseLLMProvider
 from src.dataset.loader import QAItem, ResponseParser
-from src.reports.generator import EvaluationResult
+from src.evaluation.cache import ResponseCache
+from src.evaluation.rate_limiter import AsyncTokenBucket
+from src.reports.generator import EvaluationResult, INFRA_FAIL
+
+
+logger = logging.getLogger(__name__)
 
 
 SYSTEM_PROMPT = (
@@ -17,25 +28,105 @@ SYSTEM_PROMPT = (
     "A linha 'Resposta:' DEVE aparecer exatamente assim, com 'Verdadeiro' ou 'Falso' no fim."
 )
 
+BATCH_SYSTEM_PROMPT = (
+    "Você está sendo avaliado em um benchmark de VERDADEIRO ou FALSO (pt-BR).\n"
+    "Você receberá várias afirmações numeradas e independentes entre si.\n"
+    "Explique brevemente se quiser, MAS OBRIGATORIAMENTE termine a mensagem com uma linha EXATA por afirmação, na ordem:\n"
+    "Resposta 1: Verdadeiro\n"
+    "Resposta 2: Falso\n"
+    "...\n"
+    "Cada linha 'Resposta N:' DEVE aparecer exatamente assim, com 'Verdadeiro' ou 'Falso' no fim."
+)
+
+
+# Errors worth retrying: rate limits, 5xx, dropped connections and timeouts
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,
+    httpx.TimeoutException,
+    httpx.TransportError,
+    asyncio.TimeoutError,
+)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Check the exception chain for a transient error (providers may wrap it)"""
+    # Chains can be cyclic (an exception re-raised in its own handler), so
+    # stop at the first one already seen, like traceback does
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, TRANSIENT_ERRORS):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
+
 
 class Evaluator:
     """Main evaluator class using LangChain providers"""
     
-    def __init__(self, provider: BaseLLMProvider, parallelism: int = 10):
+    def __init__(self, provider: BaseLLMProvider, parallelism: int = 10, prompt_batch_size: int = 1,
+                 rpm: Optional[float] = None, progress_label: str = "Evaluating",
+                 progress_position: Optional[int] = None, cache: Optional[ResponseCache] = None):
         self.provider = provider
         self.parallelism = parallelism
-        self.parser = ResponseParser()
+        self.prompt_batch_size = max(1, prompt_batch_size)
+        # Caps provider calls in flight across everything this evaluator runs
+        self._semaphore = asyncio.Semaphore(parallelism)
+        self.rate_limiter = AsyncTokenBucket.from_rpm(rpm) if rpm else None
+        self.cache = cache
+        # Label/row of the progress bar, so concurrent evaluators don't overwrite each other
+        self.progress_label = progress_label
+        self.progress_position = progress_position
+    
+    @retry(
+        retry=retry_if_exception(_is_transient),
+        wait=wait_exponential_jitter(initial=1, max=30),
+        stop=stop_after_attempt(3),
+        reraise=True
+    )
+    async def _invoke_provider(self, system_prompt: str, user_prompt: str) -> str:
+        """Call the provider, respecting the rate limit and retrying transient failures"""
+        # Each attempt takes its own slot, so retry backoff doesn't hold one
+        async with self._semaphore:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            return await self.provider.ainvoke(system_prompt, user_prompt)
+    
+    async def call_provider(self, system_prompt: str, user_prompt: str) -> str:
+        """Get a completion, served from the response cache when possible"""
+        if self.cache is None:
+            return await self._invoke_provider(system_prompt, user_prompt)
+        
+        config = self.provider.config
+        key = ResponseCache.make_key(
+            type(self.provider).__name__, config.base_url, config.model_name,
+            system_prompt, user_prompt, config.temperature, config.max_tokens,
+            # Sorted so the same extra params always give the same key
+            json.dumps(config.extra_params, sort_keys=True, default=str)
+        )
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            return cached
+        
+        response = await self._invoke_provider(system_prompt, user_prompt)
+        await self.cache.aset(key, response)
+        return response
     
     async def evaluate_single(self, item: QAItem) -> EvaluationResult:
         """Evaluate a single question"""
         try:
-            response = await self.provider.ainvoke(SYSTEM_PROMPT, item.pergunta)
+            response = await self.call_provider(SYSTEM_PROMPT, item.pergunta)
         except Exception as e:
-            response = f"[ERRO NA CHAMADA]: {e}"
+            # Infrastructure failure, not a model mistake: kept out of the accuracy
+            response = f"{INFRA_FAIL}: {e}"
             pred = None
             correta = False
+            falha_infra = True
         else:
-            pred, correta = self.parser.validate_response(response, item.esperado)
+            pred, correta = ResponseParser.validate_response(response, item.esperado)
+            falha_infra = False
         
         return EvaluationResult(
             arquivo=item.arquivo,
@@ -45,51 +136,122 @@ class Evaluator:
             esperado=item.esperado,
             pred=pred,
             correta=correta,
-            resposta_bruta=response
+            resposta_bruta=response,
+            falha_infra=falha_infra
         )
     
-    async def evaluate_batch(self, items: List[QAItem], show_progress: bool = True) -> List[EvaluationResult]:
-        """Evaluate a batch of questions in parallel"""
-        results = []
+    async def evaluate_group(self, items: Sequence[QAItem]) -> List[EvaluationResult]:
+        """Evaluate several questions with a single numbered prompt"""
+        user_prompt = "\n".join(f"{i}) {item.pergunta}" for i, item in enumerate(items, 1))
+        try:
+            response = await self.call_provider(BATCH_SYSTEM_PROMPT, user_prompt)
+        except Exception as e:
+            # Each question is retried on its own below and flagged there if it fails again
+            logger.warning("Batched call for %d questions failed, asking them one by one: %s", len(items), e)
+            labels = {}
+        else:
+            labels = ResponseParser.parse_batch_labels(response)
+        
+        results: List[Optional[EvaluationResult]] = [None] * len(items)
+        missing = []
+        for i, item in enumerate(items, 1):
+            parsed = labels.get(i)
+            if parsed is None:
+                # Missing line or failed call: ask this question on its own
+                missing.append(i - 1)
+                continue
+            
+            pred, line = parsed
+            results[i - 1] = EvaluationResult(
+                arquivo=item.arquivo,
+                titulo=item.titulo,
+                idx_local=item.idx_local,
+                pergunta=item.pergunta,
+                esperado=item.esperado,
+                pred=pred,
+                correta=pred == item.esperado,
+                # Only this question's answer line, not the whole batched response
+                resposta_bruta=line
+            )
+        
+        if missing:
+            singles = await asyncio.gather(*(self.evaluate_single(items[idx]) for idx in missing))
+            for idx, result in zip(missing, singles):
+                results[idx] = result
+        
+        return results
+    
+    async def evaluate_batch(self, items: Sequence[QAItem], show_progress: bool = True,
+                             on_result: Optional[Callable[[EvaluationResult], None]] = None) -> List[EvaluationResult]:
+        """Evaluate a batch of questions keeping up to `parallelism` calls in flight"""
+        results: List[Optional[EvaluationResult]] = [None] * len(items)
+        size = self.prompt_batch_size
+
+        async def run(start: int, group: Sequence[QAItem]):
+            if len(group) == 1:
+                return start, [await self.evaluate_single(group[0])]
+            return start, await self.evaluate_group(group)
 
         # Single progress bar for all items
-        progress_bar = tqdm(total=len(items), desc="Evaluating: 0/0 (0.0%)") if show_progress else None
+        progress_bar = tqdm(
+            total=len(items),
+            desc=self.progress_label,
+            position=self.progress_position
+        ) if show_progress else None
 
-        # Process in chunks based on parallelism
-        for i in range(0, len(items), self.parallelism):
-            batch = items[i:i + self.parallelism]
+        # Dispatch everything at once; the provider-call semaphore keeps exactly
+        # N calls running so one slow response no longer stalls the rest
+        tasks = [
+            asyncio.create_task(run(start, items[start:start + size]))
+            for start in range(0, len(items), size)
+        ]
 
-            tasks = [self.evaluate_single(item) for item in batch]
-            batch_results = await asyncio.gather(*tasks)
+        correct = 0
+        total = 0
+        for next_done in asyncio.as_completed(tasks):
+            start, group_results = await next_done
+            for offset, result in enumerate(group_results):
+                results[start + offset] = result
+                if on_result:
+                    on_result(result)
 
-            results.extend(batch_results)
+                if result.falha_infra:
+                    continue
+                total += 1
+                if result.correta:
+                    correct += 1
 
             if progress_bar:
-                correct = sum(1 for r in results if r.correta)
-                total = len(results)
+                # Shown as a postfix so it is drawn with the bar's own refresh
                 accuracy = (correct / total * 100) if total > 0 else 0
-                progress_bar.set_description(f"Evaluating: {correct}/{total} ({accuracy:.1f}%)")
-                progress_bar.update(len(batch))
+                progress_bar.set_postfix(acc=f"{correct}/{total} ({accuracy:.1f}%)", refresh=False)
+                progress_bar.update(len(group_results))
 
         if progress_bar:
             progress_bar.close()
 
         return results
     
-    async def evaluate(self, items: List[QAItem], limit: Optional[int] = None, 
-                       show_progress: bool = True) -> List[EvaluationResult]:
+    async def evaluate(self, items: Iterable[QAItem], limit: Optional[int] = None, 
+                       show_progress: bool = True,
+                       on_result: Optional[Callable[[EvaluationResult], None]] = None) -> List[EvaluationResult]:
         """
         Evaluate all items
         
         Args:
-            items: List of QAItems to evaluate
+            items: QAItems to evaluate, either a sequence or an iterator
+                   such as DatasetLoader.iter_dataset
             limit: Optional limit on number of items to evaluate
             show_progress: Whether to show progress bar
+            on_result: Optional callback invoked with each result as soon as it completes
             
         Returns:
             List of EvaluationResult objects
         """
-        if limit:
+        if not isinstance(items, Sequence):
+            # Only the items that will be evaluated are pulled from the iterator
+            items = list(islice(items, limit or None))
+        elif limit:
             items = items[:limit]
         
         if len(items) == 0:
@@ -97,4 +259,4 @@ class Evaluator:
             return []
         
         print(f"Total de perguntas a avaliar: {len(items)}")
-        return await self.evaluate_batch(items, show_progress)
\ No newline at end of file
+        return await self.evaluate_batch(items, show_progress, on_result)
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""Async rate limiting for provider calls"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class AsyncTokenBucket:
+    """Token bucket that spaces out calls to stay under a provider's request rate"""
+    
+    def __init__(self, rate_per_sec: float, capacity: Optional[float] = None):
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        
+        self.rate = rate_per_sec
+        # Allow at most one second worth of burst by default
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_sec)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    @classmethod
+    def from_rpm(cls, rpm: float) -> "AsyncTokenBucket":
+        """Create a bucket from a requests-per-minute cap"""
+        return cls(rpm / 60)
+    
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        # Holding the lock while sleeping makes waiters queue up in order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) / self.rate)
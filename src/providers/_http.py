@@ -0,0 +1,55 @@
+"""HTTP clients for the API-based providers"""
+
+import atexit
+import weakref
+from importlib.util import find_spec
+from typing import Optional
+import httpx
+
+
+# Pool used when the caller doesn't size it to its own concurrency
+DEFAULT_MAX_CONNECTIONS = 128
+DEFAULT_MAX_KEEPALIVE = 64
+KEEPALIVE_EXPIRY = 30.0
+
+# HTTP/2 multiplexes concurrent requests over one connection; it needs the
+# h2 package (httpx[http2]), otherwise clients stay on HTTP/1.1
+HTTP2 = find_spec("h2") is not None
+
+# Sync clients still open at exit; async ones are closed by their provider
+_sync_clients: "weakref.WeakSet[httpx.Client]" = weakref.WeakSet()
+
+
+def _limits(max_connections: Optional[int]) -> httpx.Limits:
+    """Connection pool limits; keep-alive covers the whole pool when it is sized explicitly"""
+    if not max_connections:
+        return httpx.Limits(
+            max_connections=DEFAULT_MAX_CONNECTIONS,
+            max_keepalive_connections=DEFAULT_MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+
+def create_http_client(max_connections: Optional[int] = None, timeout: Optional[float] = None) -> httpx.Client:
+    """Create a pooled sync client; each provider owns one, sized to its own concurrency"""
+    client = httpx.Client(limits=_limits(max_connections), timeout=timeout, http2=HTTP2)
+    _sync_clients.add(client)
+    return client
+
+
+def create_async_http_client(max_connections: Optional[int] = None,
+                             timeout: Optional[float] = None) -> httpx.AsyncClient:
+    """Create a pooled async client; each provider owns one, sized to its own concurrency"""
+    return httpx.AsyncClient(limits=_limits(max_connections), timeout=timeout, http2=HTTP2)
+
+
+@atexit.register
+def close_http_clients():
+    """Close sync clients whose provider was never closed"""
+    for client in list(_sync_clients):
+        client.close()
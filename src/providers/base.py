@@ -1,10 +1,16 @@
 """Base provider module for LLM providers"""
 
+import logging
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass, field
+import httpx
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+from ._http import create_http_client, create_async_http_client
+
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -16,6 +22,7 @@ class ProviderConfig:
     api_key: Optional[str] = None
     base_url: Optional[str] = None
     timeout: Optional[int] = 120
+    max_connections: Optional[int] = None  # HTTP pool size; None uses the default pool size
     extra_params: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -25,6 +32,10 @@ class BaseLLMProvider(ABC):
     def __init__(self, config: ProviderConfig):
         self.config = config
         self._llm = None
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        # Last system prompt and its message, reused while the prompt is unchanged
+        self._cached_sys: Optional[Tuple[str, SystemMessage]] = None
     
     @abstractmethod
     def initialize(self) -> BaseLanguageModel:
@@ -38,18 +49,45 @@ class BaseLLMProvider(ABC):
             self._llm = self.initialize()
         return self._llm
     
+    @property
+    def http_client(self) -> httpx.Client:
+        """Sync HTTP client owned by this provider, reused across its requests"""
+        if self._http_client is None:
+            self._http_client = create_http_client(self.config.max_connections, self.config.timeout)
+        return self._http_client
+    
+    @property
+    def http_async_client(self) -> httpx.AsyncClient:
+        """Async HTTP client owned by this provider, reused across its requests"""
+        if self._http_async_client is None:
+            self._http_async_client = create_async_http_client(self.config.max_connections, self.config.timeout)
+        return self._http_async_client
+    
+    async def aclose(self):
+        """Close this provider's HTTP clients"""
+        # An LLM built on the closed clients is rebuilt on next use; providers
+        # that never used one (e.g. Bedrock's boto3 client) keep theirs
+        if self._http_client is not None or self._http_async_client is not None:
+            self._llm = None
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+            self._http_async_client = None
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+    
     def create_messages(self, system_prompt: str, user_prompt: str) -> List[BaseMessage]:
         """Create messages for the LLM"""
+        # Identity check: callers pass the same prompt constant on every call
+        if self._cached_sys is None or self._cached_sys[0] is not system_prompt:
+            self._cached_sys = (system_prompt, SystemMessage(content=system_prompt))
         return [
-            SystemMessage(content=system_prompt),
+            self._cached_sys[1],
             HumanMessage(content=user_prompt)
         ]
     
     async def ainvoke(self, system_prompt: str, user_prompt: str) -> str:
         """Async invoke the LLM with given prompts"""
-        import logging
-        logger = logging.getLogger(__name__)
-
         messages = self.create_messages(system_prompt, user_prompt)
         
         try:
@@ -57,8 +95,8 @@ class BaseLLMProvider(ABC):
             result = response.content.strip() if hasattr(response, 'content') else str(response).strip()
             return result
         except Exception as e:
-            logger.error(f"❌ BaseLLMProvider.ainvoke failed: {str(e)}")
-            logger.error(f"❌ Exception type: {type(e).__name__}")
+            logger.error("❌ BaseLLMProvider.ainvoke failed: %s", e)
+            logger.error("❌ Exception type: %s", type(e).__name__)
             raise
     
     def invoke(self, system_prompt: str, user_prompt: str) -> str:
@@ -1,6 +1,7 @@
 """Factory for creating LLM providers"""
 
-from typing import Optional
+import hashlib
+from typing import Dict, Optional, Tuple
 from .base import BaseLLMProvider, ProviderConfig
 from .maritaca import MaritacaProvider
 from .openai_provider import OpenAIProvider
@@ -8,11 +9,53 @@ from .ollama import OllamaProvider
 from .bedrock import BedrockProvider
 
 
+def _secret_hash(value: Optional[str]) -> Optional[str]:
+    """Hash credentials so they can be part of a cache key without being stored as-is"""
+    return hashlib.sha256(value.encode("utf-8")).hexdigest() if value else None
+
+
 class ProviderFactory:
     """Factory for creating LLM provider instances"""
     
+    # Providers built by get_or_create, reused so their HTTP connection pools survive
+    _instances: Dict[Tuple, BaseLLMProvider] = {}
+    
+    @staticmethod
+    def _config_key(provider_config, max_connections: Optional[int]) -> Tuple:
+        """Hashable key covering every setting that affects the provider instance"""
+        return (
+            provider_config.type,
+            provider_config.model,
+            provider_config.base_url,
+            _secret_hash(provider_config.api_key),
+            _secret_hash(provider_config.aws_bearer_token),
+            provider_config.region,
+            provider_config.temperature,
+            provider_config.max_tokens,
+            provider_config.timeout,
+            max_connections,
+            repr(sorted(provider_config.extra_params.items())),
+        )
+    
+    @classmethod
+    def get_or_create(cls, provider_config, max_connections: Optional[int] = None) -> BaseLLMProvider:
+        """Return a cached provider for this configuration, creating it on first use"""
+        key = cls._config_key(provider_config, max_connections)
+        provider = cls._instances.get(key)
+        if provider is None:
+            provider = cls.create_from_config(provider_config, max_connections=max_connections)
+            cls._instances[key] = provider
+        return provider
+    
+    @classmethod
+    async def aclose_all(cls):
+        """Close every cached provider's HTTP clients and forget the providers"""
+        for provider in cls._instances.values():
+            await provider.aclose()
+        cls._instances.clear()
+    
     @staticmethod
-    def create_from_config(provider_config) -> BaseLLMProvider:
+    def create_from_config(provider_config, max_connections: Optional[int] = None) -> BaseLLMProvider:
         """Create a provider instance from configuration"""
         
         # Create base provider config
@@ -23,6 +66,7 @@ class ProviderFactory:
             api_key=provider_config.api_key,
             base_url=provider_config.base_url,
             timeout=provider_config.timeout,
+            max_connections=max_connections,
             extra_params=provider_config.extra_params
         )
         
@@ -56,6 +100,7 @@ class ProviderFactory:
         temperature: float = 0.0,
         max_tokens: int = 12000,
         timeout: int = 120,
+        max_connections: Optional[int] = None,
         **kwargs
     ) -> BaseLLMProvider:
         """Create a provider instance with direct parameters"""
@@ -66,7 +111,8 @@ class ProviderFactory:
             max_tokens=max_tokens,
             api_key=api_key,
             base_url=base_url,
-            timeout=timeout
+            timeout=timeout,
+            max_connections=max_connections
         )
         
         if provider_type == "maritaca":
@@ -1,15 +1,16 @@
 """Maritaca/Sabiá provider implementation using direct OpenAI client"""
 
-from typing import List, Optional, Any, AsyncIterator, Iterator
+from typing import List, Optional, Any, AsyncIterator, ClassVar, Iterator
 from .base import BaseLLMProvider, ProviderConfig
 import os
-import asyncio
 import logging
+from functools import lru_cache
 import json
 
 # Configure logging for Maritaca provider
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+# Quiet by default; set HEALTHBENCH_LOG_LEVEL=DEBUG (or INFO, ...) to see more
+logger.setLevel(os.getenv("HEALTHBENCH_LOG_LEVEL", "WARNING").upper())
 if not logger.handlers:
     handler = logging.StreamHandler()
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -19,7 +20,7 @@ if not logger.handlers:
 # LangChain imports
 try:
     from langchain_core.language_models import BaseLanguageModel
-    from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
+    from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage, AIMessageChunk
     from langchain_core.outputs import ChatResult, ChatGeneration
     from langchain_core.outputs.chat_generation import ChatGenerationChunk
     from langchain_core.callbacks import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
@@ -27,7 +28,7 @@ try:
 except ImportError:
     # Fallback imports for older versions
     from langchain.schema import BaseLanguageModel
-    from langchain.schema.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
+    from langchain.schema.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage, AIMessageChunk
     from langchain.schema.output import ChatResult, ChatGeneration
     from langchain.callbacks.manager import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
     from langchain.chat_models.base import BaseChatModel
@@ -38,20 +39,47 @@ except ImportError:
 # OpenAI imports
 try:
     import openai
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
 except ImportError:
     raise ImportError("Please install openai: pip install openai")
 
+from pydantic import PrivateAttr
+
+
+# Map model names to Maritaca model IDs
+MARITACA_MODEL_IDS = {
+    "sabia-3": "sabia-3",
+    "sabia-3-large": "sabia-3",  # Alias
+    "sabiazinho-3": "sabiazinho-3",
+    "sabia-2-small": "sabia-2-small",
+    "sabia-2-medium": "sabia-2-medium",
+}
+
+
+@lru_cache(maxsize=256)
+def _system_message_dict(content: str) -> dict:
+    """OpenAI-format system message, built once per distinct prompt (treat as read-only)"""
+    # Stripped here, once, so every request starts with the exact same bytes
+    # and the server's prefix/prompt cache can reuse it
+    return {"role": "system", "content": content.strip()}
+
 
 class MaritacaOpenAIWrapper(BaseChatModel):
     """Custom wrapper for Maritaca using direct OpenAI client"""
     
     client: Any  # OpenAI client instance
+    aclient: Any  # AsyncOpenAI client instance
     model: str
     temperature: float = 0.0
     max_tokens: int = 12000
     timeout: int = 120
     
+    # Call kwargs the Maritaca API rejects
+    FORBIDDEN_KWARGS: ClassVar[frozenset] = frozenset({"max_completion_tokens"})
+    
+    # Parameters shared by every call, built once in __init__
+    _base_api_params: dict = PrivateAttr(default_factory=dict)
+    
     def __init__(
         self,
         api_key: str,
@@ -60,25 +88,44 @@ class MaritacaOpenAIWrapper(BaseChatModel):
         temperature: float = 0.0,
         max_tokens: int = 12000,
         timeout: Optional[int] = 120,
+        http_client: Optional[Any] = None,
+        http_async_client: Optional[Any] = None,
         **kwargs
     ):
-        # Initialize the OpenAI client first
+        # Initialize the OpenAI clients first; they don't retry, transient errors
+        # are retried by Evaluator._invoke_provider's @retry, under its rate limit
         client = OpenAI(
             api_key=api_key,
             base_url=base_url,
             timeout=timeout or 120,
-            max_retries=2
+            max_retries=0,
+            http_client=http_client
+        )
+        aclient = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout or 120,
+            max_retries=0,
+            http_client=http_async_client
         )
         
         # Call parent with all required fields
         super().__init__(
             client=client,
+            aclient=aclient,
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
             timeout=timeout or 120,
             **kwargs
         )
+        
+        # Use max_tokens (not max_completion_tokens)
+        self._base_api_params = {
+            'model': self.model,
+            'temperature': self.temperature,
+            'max_tokens': self.max_tokens,
+        }
     
     @property
     def _llm_type(self) -> str:
@@ -88,9 +135,16 @@ class MaritacaOpenAIWrapper(BaseChatModel):
     def _convert_messages_to_openai_format(self, messages: List[BaseMessage]) -> List[dict]:
         """Convert LangChain messages to OpenAI format"""
         openai_messages = []
-        for msg in messages:
+        for i, msg in enumerate(messages):
             if isinstance(msg, SystemMessage):
-                openai_messages.append({"role": "system", "content": msg.content})
+                # Prefix caching only works when the system prompt leads the request
+                if i != 0:
+                    raise ValueError("SystemMessage must be the first message")
+                # The same system prompt goes with every question; reuse its dict
+                if isinstance(msg.content, str):
+                    openai_messages.append(_system_message_dict(msg.content))
+                else:
+                    openai_messages.append({"role": "system", "content": msg.content})
             elif isinstance(msg, HumanMessage):
                 openai_messages.append({"role": "user", "content": msg.content})
             elif isinstance(msg, AIMessage):
@@ -100,6 +154,53 @@ class MaritacaOpenAIWrapper(BaseChatModel):
                 openai_messages.append({"role": "user", "content": str(msg.content)})
         return openai_messages
     
+    def _build_api_params(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: dict) -> dict:
+        """Build the chat.completions.create parameters for a call"""
+        # Convert messages to OpenAI format
+        openai_messages = self._convert_messages_to_openai_format(messages)
+        
+        api_params = {**self._base_api_params, 'messages': openai_messages}
+        if stop:
+            api_params['stop'] = stop
+        
+        # Filter out problematic parameters
+        if kwargs:
+            forbidden = self.FORBIDDEN_KWARGS
+            api_params.update((k, v) for k, v in kwargs.items() if k not in forbidden)
+        return api_params
+    
+    def _create_completion(self, api_params: dict) -> Any:
+        """chat.completions.create on the sync client"""
+        return self.client.chat.completions.create(**api_params)
+    
+    async def _acreate_completion(self, api_params: dict) -> Any:
+        """chat.completions.create on the async client"""
+        return await self.aclient.chat.completions.create(**api_params)
+    
+    @staticmethod
+    def _create_chat_result(response: Any) -> ChatResult:
+        """Convert an OpenAI chat completion into a LangChain ChatResult"""
+        # Extract the response content
+        content = response.choices[0].message.content or ""
+        
+        # Create LangChain ChatGeneration
+        generation = ChatGeneration(
+            message=AIMessage(content=content),
+            generation_info={
+                "finish_reason": response.choices[0].finish_reason,
+                "model": response.model,
+            }
+        )
+        
+        return ChatResult(generations=[generation])
+    
+    @staticmethod
+    def _log_failure(e: Exception, kwargs: dict):
+        """Log a failed API call"""
+        logger.error("❌ Maritaca API call failed: %s", e)
+        logger.error("❌ Exception type: %s", type(e).__name__)
+        logger.error("❌ Call kwargs: %s", kwargs)
+    
     def _generate(
         self,
         messages: List[BaseMessage],
@@ -108,48 +209,13 @@ class MaritacaOpenAIWrapper(BaseChatModel):
         **kwargs: Any,
     ) -> ChatResult:
         """Generate chat completion using OpenAI client"""
-        
-        # Convert messages to OpenAI format
-        openai_messages = self._convert_messages_to_openai_format(messages)
-        
-        # Call OpenAI API with max_tokens (not max_completion_tokens)
         try:
-            # Filter out problematic parameters
-            original_kwargs = kwargs.copy()
-            filtered_kwargs = {k: v for k, v in kwargs.items()
-                      if k not in ['max_completion_tokens']}
-            
-            # Prepare API call parameters
-            api_params = {
-                'model': self.model,
-                'messages': openai_messages,
-                'temperature': self.temperature,
-                'max_tokens': self.max_tokens,
-                'stop': stop,
-                **filtered_kwargs
-            }
-            
-            response = self.client.chat.completions.create(**api_params)
-            
-            # Extract the response content
-            content = response.choices[0].message.content or ""
-            
-            # Create LangChain ChatGeneration
-            generation = ChatGeneration(
-                message=AIMessage(content=content),
-                generation_info={
-                    "finish_reason": response.choices[0].finish_reason,
-                    "model": response.model,
-                }
-            )
-            
-            return ChatResult(generations=[generation])
+            api_params = self._build_api_params(messages, stop, kwargs)
+            response = self._create_completion(api_params)
+            return self._create_chat_result(response)
             
         except Exception as e:
-            logger.error(f"❌ Maritaca API call failed: {str(e)}")
-            logger.error(f"❌ Exception type: {type(e).__name__}")
-            logger.error(f"❌ Original kwargs: {original_kwargs if 'original_kwargs' in locals() else 'N/A'}")
-            logger.error(f"❌ Filtered kwargs: {filtered_kwargs if 'filtered_kwargs' in locals() else 'N/A'}")
+            self._log_failure(e, kwargs)
             # Handle API errors
             raise RuntimeError(f"Maritaca API call failed: {str(e)}")
     
@@ -160,17 +226,35 @@ class MaritacaOpenAIWrapper(BaseChatModel):
         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> ChatResult:
-        """Async generate - delegate to sync for now"""
+        """Generate chat completion using the AsyncOpenAI client"""
+        # Awaiting the async client lets calls overlap on the event loop
+        # instead of queueing on the default thread pool
+        try:
+            api_params = self._build_api_params(messages, stop, kwargs)
+            response = await self._acreate_completion(api_params)
+            return self._create_chat_result(response)
+            
+        except Exception as e:
+            self._log_failure(e, kwargs)
+            # Handle API errors
+            raise RuntimeError(f"Maritaca API call failed: {str(e)}")
+    
+    @staticmethod
+    def _create_generation_chunk(event: Any) -> Optional[ChatGenerationChunk]:
+        """Convert a streamed completion event into a ChatGenerationChunk"""
+        if not event.choices:
+            return None
+        choice = event.choices[0]
+        content = (choice.delta.content or "") if choice.delta else ""
         
-        # For simplicity, we'll run the sync version in an executor
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._generate,
-            messages,
-            stop,
-            run_manager,
-            **kwargs
+        # The terminal event carries the finish reason
+        generation_info = None
+        if choice.finish_reason is not None:
+            generation_info = {"finish_reason": choice.finish_reason, "model": event.model}
+        
+        return ChatGenerationChunk(
+            message=AIMessageChunk(content=content, response_metadata=generation_info or {}),
+            generation_info=generation_info
         )
     
     def _stream(
@@ -180,8 +264,22 @@ class MaritacaOpenAIWrapper(BaseChatModel):
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> Iterator[ChatGenerationChunk]:
-        """Stream is not implemented for this wrapper"""
-        raise NotImplementedError("Streaming is not supported for Maritaca wrapper")
+        """Stream chat completion deltas using OpenAI client"""
+        try:
+            api_params = self._build_api_params(messages, stop, kwargs)
+            stream = self._create_completion({**api_params, 'stream': True})
+        except Exception as e:
+            self._log_failure(e, kwargs)
+            raise RuntimeError(f"Maritaca API call failed: {str(e)}")
+        
+        with stream:
+            for event in stream:
+                chunk = self._create_generation_chunk(event)
+                if chunk is None:
+                    continue
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
     
     async def _astream(
         self,
@@ -190,8 +288,22 @@ class MaritacaOpenAIWrapper(BaseChatModel):
         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> AsyncIterator[ChatGenerationChunk]:
-        """Async stream is not implemented for this wrapper"""
-        raise NotImplementedError("Async streaming is not supported for Maritaca wrapper")
+        """Stream chat completion deltas using the AsyncOpenAI client"""
+        try:
+            api_params = self._build_api_params(messages, stop, kwargs)
+            stream = await self._acreate_completion({**api_params, 'stream': True})
+        except Exception as e:
+            self._log_failure(e, kwargs)
+            raise RuntimeError(f"Maritaca API call failed: {str(e)}")
+        
+        async with stream:
+            async for event in stream:
+                chunk = self._create_generation_chunk(event)
+                if chunk is None:
+                    continue
+                if run_manager:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
 
 
 class MaritacaProvider(BaseLLMProvider):
@@ -212,15 +324,7 @@ class MaritacaProvider(BaseLLMProvider):
         base_url = self.config.base_url or "https://chat.maritaca.ai/api"
         
         # Map model names to Maritaca model IDs
-        model_mapping = {
-            "sabia-3": "sabia-3",
-            "sabia-3-large": "sabia-3",  # Alias
-            "sabiazinho-3": "sabiazinho-3",
-            "sabia-2-small": "sabia-2-small",
-            "sabia-2-medium": "sabia-2-medium",
-        }
-        
-        model_name = model_mapping.get(self.config.model_name, self.config.model_name)
+        model_name = MARITACA_MODEL_IDS.get(self.config.model_name, self.config.model_name)
         
         # Return our custom wrapper that uses OpenAI client directly
         return MaritacaOpenAIWrapper(
@@ -229,5 +333,7 @@ class MaritacaProvider(BaseLLMProvider):
             model=model_name,
             temperature=self.config.temperature,
             max_tokens=self.config.max_tokens,
-            timeout=self.config.timeout or 120  # Default timeout if None
+            timeout=self.config.timeout or 120,  # Default timeout if None
+            http_client=self.http_client,
+            http_async_client=self.http_async_client
         )
\ No newline at end of file
@@ -21,5 +21,9 @@ class OpenAIProvider(BaseLLMProvider):
             api_key=self.config.api_key,
             base_url=base_url,
             timeout=self.config.timeout,
+            # Transient errors are retried by the Evaluator, under its rate limit
+            max_retries=0,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
             **self.config.extra_params
         )
\ No newline at end of file
@@ -1,201 +1,20 @@
 """Report generation module"""
 
-import csv
 import os
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass
 from datetime import datetime
-import json
+from src.utils.json_io import dumps
 
 
-@dataclass
-class EvaluationResult:
-    """Result of a single evaluation"""
-    arquivo: str
-    titulo: str
-    idx_local: int
-    pergunta: str
-    esperado: str
-    pred: Optional[str]
-    correta: bool
-    resposta_bruta: str
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for CSV output"""
-        return {
-            "arquivo": self.arquivo,
-            "titulo": self.titulo,
-            "idx_local": str(self.idx_local),
-            "pergunta": self.pergunta.replace("\n", " ").strip(),
-            "esperado": self.esperado,
-            "pred": self.pred or "",
-            "correta": "1" if self.correta else "0",
-            "resposta_bruta": (self.resposta_bruta or "").replace("\n", "\\n")
-        }
+# Marker stored in resposta_bruta when the provider call failed after all retries
+INFRA_FAIL = "[INFRA_FAIL]"
 
 
-class ReportGenerator:
-    """Generates evaluation reports and saves results"""
-    
-    def __init__(self, output_path: str = "resultados_avaliacao.csv"):
-        self.output_path = output_path
-        self.results: List[EvaluationResult] = []
-    
-    def add_result(self, result: EvaluationResult):
-        """Add a single evaluation result"""
-        self.results.append(result)
-    
-    def add_results(self, results: List[EvaluationResult]):
-        """Add multiple evaluation results"""
-        self.results.extend(results)
-    
-    def calculate_metrics(self) -> Dict[str, Any]:
-        """Calculate evaluation metrics"""
-        total = len(self.results)
-        if total == 0:
-            return {
-                "total": 0,
-                "acertos": 0,
-                "erros": 0,
-                "acuracia": 0.0,
-                "sem_resposta": 0
-            }
-        
-        correct = sum(1 for r in self.results if r.correta)
-        no_answer = sum(1 for r in self.results if r.pred is None or r.pred == "")
-        
-        return {
-            "total": total,
-            "acertos": correct,
-            "erros": total - correct,
-            "acuracia": correct / total,
-            "sem_resposta": no_answer,
-            "por_arquivo": self._metrics_by_file(),
-            "por_titulo": self._metrics_by_title()
-        }
-    
-    def _metrics_by_file(self) -> Dict[str, Dict[str, Any]]:
-        """Calculate metrics grouped by file"""
-        by_file = {}
-        for result in self.results:
-            if result.arquivo not in by_file:
-                by_file[result.arquivo] = {"total": 0, "correct": 0}
-            by_file[result.arquivo]["total"] += 1
-            if result.correta:
-                by_file[result.arquivo]["correct"] += 1
-        
-        for arquivo in by_file:
-            total = by_file[arquivo]["total"]
-            correct = by_file[arquivo]["correct"]
-            by_file[arquivo]["accuracy"] = correct / total if total > 0 else 0
-        
-        return by_file
-    
-    def _metrics_by_title(self) -> Dict[str, Dict[str, Any]]:
-        """Calculate metrics grouped by title"""
-        by_title = {}
-        for result in self.results:
-            if result.titulo not in by_title:
-                by_title[result.titulo] = {"total": 0, "correct": 0}
-            by_title[result.titulo]["total"] += 1
-            if result.correta:
-                by_title[result.titulo]["correct"] += 1
-        
-        for titulo in by_title:
-            total = by_title[titulo]["total"]
-            correct = by_title[titulo]["correct"]
-            by_title[titulo]["accuracy"] = correct / total if total > 0 else 0
-        
-        return by_title
-    
-    def save_csv(self):
-        """Save results to CSV file"""
-        if not self.results:
-            print("Nenhum resultado para salvar")
-            return
-        
-        fieldnames = [
-            "arquivo", "titulo", "idx_local", "pergunta",
-            "esperado", "pred", "correta", "resposta_bruta"
-        ]
-        
-        with open(self.output_path, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for result in self.results:
-                writer.writerow(result.to_dict())
-        
-        print(f"CSV salvo em: {os.path.abspath(self.output_path)}")
-    
-    def print_summary(self, model_name: str = ""):
-        """Print evaluation summary"""
-        metrics = self.calculate_metrics()
-        
-        print("\n" + "=" * 50)
-        print(" " * 15 + "RESUMO DA AVALIAÇÃO")
-        print("=" * 50)
-        
-        if model_name:
-            print(f"Modelo:           {model_name}")
-        print(f"Data:             {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"Total perguntas:  {metrics['total']}")
-        print(f"Acertos:          {metrics['acertos']}")
-        print(f"Erros:            {metrics['erros']}")
-        print(f"Acurácia:         {metrics['acuracia']:.4f}")
-        print(f"Sem resposta:     {metrics['sem_resposta']}")
-        
-        if metrics.get('por_arquivo'):
-            print("\n" + "-" * 50)
-            print("Acurácia por arquivo:")
-            for arquivo, stats in metrics['por_arquivo'].items():
-                print(f"  {arquivo}: {stats['accuracy']:.4f} ({stats['correct']}/{stats['total']})")
-        
-        print("=" * 50)
-    
-    def save_detailed_report(self, path: str = ""):
-        """Save detailed JSON report"""
-        if not path:
-            path = self.output_path.replace('.csv', '_detailed.json')
-        
-        metrics = self.calculate_metrics()
-        
-        report = {
-            "timestamp": datetime.now().isoformat(),
-            "metrics": metrics,
-            "results": [asdict(r) for r in self.results]
-        }
-        
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
-        
-        print(f"Relatório detalhado salvo em: {os.path.abspath(path)}")
-    
-    def save_html_report(self, path: str = "", model_name: str = ""):
-        """Save HTML report"""
-        if not path:
-            path = self.output_path.replace('.csv', '_report.html')
-        
-        metrics = self.calculate_metrics()
-        
-        html_content = self._generate_html_report(metrics, model_name)
-        
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        
-        print(f"Relatório HTML salvo em: {os.path.abspath(path)}")
-    
-    def _generate_html_report(self, metrics: Dict[str, Any], model_name: str = "") -> str:
-        """Generate HTML report content"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        html = f"""<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Relatório de Avaliação - HealthBench BR</title>
-    <style>
-        body {{
+# Static stylesheet of the HTML report
+_HTML_CSS = """        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             line-height: 1.6;
             color: #333;
@@ -203,8 +22,8 @@ class ReportGenerator:
             margin: 0 auto;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
@@ -212,169 +31,600 @@ class ReportGenerator:
             text-align: center;
             margin-bottom: 30px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             margin: 0;
             font-size: 2.5em;
             font-weight: 300;
-        }}
-        .header p {{
+        }
+        .header p {
             margin: 10px 0 0 0;
             opacity: 0.9;
             font-size: 1.1em;
-        }}
-        .summary {{
+        }
+        .summary {
             background: white;
             padding: 30px;
             border-radius: 10px;
             margin-bottom: 30px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .summary h2 {{
+        }
+        .summary h2 {
             color: #667eea;
             border-bottom: 3px solid #667eea;
             padding-bottom: 10px;
             margin-top: 0;
-        }}
-        .metrics-grid {{
+        }
+        .metrics-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin: 20px 0;
-        }}
-        .metric-card {{
+        }
+        .metric-card {
             background: #f8f9fa;
             padding: 20px;
             border-radius: 8px;
             text-align: center;
             border-left: 4px solid #667eea;
-        }}
-        .metric-value {{
+        }
+        .metric-value {
             font-size: 2em;
             font-weight: bold;
             color: #667eea;
             margin: 0;
-        }}
-        .metric-label {{
+        }
+        .metric-label {
             color: #666;
             font-size: 0.9em;
             margin: 5px 0 0 0;
-        }}
-        .accuracy-bar {{
+        }
+        .accuracy-bar {
             width: 100%;
             height: 20px;
             background: #e0e0e0;
             border-radius: 10px;
             margin: 10px 0;
             overflow: hidden;
-        }}
-        .accuracy-fill {{
+        }
+        .accuracy-fill {
             height: 100%;
             background: linear-gradient(90deg, #667eea, #764ba2);
             border-radius: 10px;
             transition: width 0.5s ease;
-        }}
-        .breakdown {{
+        }
+        .breakdown {
             background: white;
             padding: 30px;
             border-radius: 10px;
             margin-bottom: 30px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .breakdown h2 {{
+        }
+        .breakdown h2 {
             color: #667eea;
             border-bottom: 3px solid #667eea;
             padding-bottom: 10px;
             margin-top: 0;
-        }}
-        .breakdown-table {{
+        }
+        .breakdown-table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
-        }}
+        }
         .breakdown-table th,
-        .breakdown-table td {{
+        .breakdown-table td {
             padding: 12px;
             text-align: left;
             border-bottom: 1px solid #ddd;
-        }}
-        .breakdown-table th {{
+        }
+        .breakdown-table th {
             background: #f8f9fa;
             font-weight: 600;
             color: #667eea;
-        }}
-        .breakdown-table tr:hover {{
+        }
+        .breakdown-table tr:hover {
             background: #f8f9fa;
-        }}
-        .results {{
+        }
+        .results {
             background: white;
             padding: 30px;
             border-radius: 10px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .results h2 {{
+        }
+        .results h2 {
             color: #667eea;
             border-bottom: 3px solid #667eea;
             padding-bottom: 10px;
             margin-top: 0;
-        }}
-        .result-item {{
+        }
+        .result-item {
             border: 1px solid #e0e0e0;
             border-radius: 8px;
             margin: 15px 0;
             padding: 20px;
             background: #fafafa;
-        }}
-        .result-header {{
+        }
+        .result-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 15px;
-        }}
-        .result-title {{
+        }
+        .result-title {
             font-weight: bold;
             color: #333;
-        }}
-        .result-status {{
+        }
+        .result-status {
             padding: 4px 12px;
             border-radius: 20px;
             font-size: 0.8em;
             font-weight: bold;
-        }}
-        .status-correct {{
+        }
+        .status-correct {
             background: #d4edda;
             color: #155724;
-        }}
-        .status-incorrect {{
+        }
+        .status-incorrect {
             background: #f8d7da;
             color: #721c24;
-        }}
-        .result-content {{
+        }
+        .result-content {
             margin: 10px 0;
-        }}
-        .result-label {{
+        }
+        .result-label {
             font-weight: bold;
             color: #555;
             margin-top: 15px;
-        }}
-        .result-text {{
+        }
+        .result-text {
             margin: 5px 0;
             padding: 10px;
             background: white;
             border-radius: 4px;
             border-left: 3px solid #667eea;
-        }}
-        @media (max-width: 768px) {{
-            .metrics-grid {{
+        }
+        @media (max-width: 768px) {
+            .metrics-grid {
                 grid-template-columns: 1fr;
-            }}
-            .result-header {{
+            }
+            .result-header {
                 flex-direction: column;
                 align-items: flex-start;
                 gap: 10px;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+
+def _csv_quote(value: str) -> str:
+    """Quote a CSV field only when needed, like the csv module's QUOTE_MINIMAL"""
+    if '"' in value:
+        return '"' + value.replace('"', '""') + '"'
+    if "," in value or "\n" in value or "\r" in value:
+        return '"' + value + '"'
+    return value
+
+
+@dataclass(slots=True)
+class EvaluationResult:
+    """Result of a single evaluation"""
+    arquivo: str
+    titulo: str
+    idx_local: int
+    pergunta: str
+    esperado: str
+    pred: Optional[str]
+    correta: bool
+    resposta_bruta: str
+    falha_infra: bool = False  # Provider call failed; excluded from accuracy
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for CSV output"""
+        return {
+            "arquivo": self.arquivo,
+            "titulo": self.titulo,
+            "idx_local": str(self.idx_local),
+            "pergunta": self.pergunta.replace("\n", " ").strip(),
+            "esperado": self.esperado,
+            "pred": self.pred or "",
+            "correta": "1" if self.correta else "0",
+            "resposta_bruta": (self.resposta_bruta or "").replace("\n", "\\n")
+        }
+    
+    def to_tuple(self) -> Tuple[str, ...]:
+        """Same values as to_dict, in FIELDNAMES order, for positional CSV writers"""
+        return (
+            self.arquivo,
+            self.titulo,
+            str(self.idx_local),
+            self.pergunta.replace("\n", " ").strip(),
+            self.esperado,
+            self.pred or "",
+            "1" if self.correta else "0",
+            (self.resposta_bruta or "").replace("\n", "\\n")
+        )
+
+
+class MetricsCounter:
+    """Running counters behind the report metrics"""
+    
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.infra_failures = 0
+        self.no_answer = 0
+        # Per-group counters hold [total, correct]
+        self.by_file: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        self.by_title: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    
+    def update(self, results: Iterable[EvaluationResult]):
+        """Count results in a single pass"""
+        correct = 0
+        infra_failures = 0
+        no_answer = 0
+        total = 0
+        by_file = self.by_file
+        by_title = self.by_title
+        for result in results:
+            total += 1
+            if result.falha_infra:
+                infra_failures += 1
+                continue
+            file_counts = by_file[result.arquivo]
+            title_counts = by_title[result.titulo]
+            file_counts[0] += 1
+            title_counts[0] += 1
+            if result.correta:
+                correct += 1
+                file_counts[1] += 1
+                title_counts[1] += 1
+            elif not result.pred:
+                no_answer += 1
+        
+        self.total += total
+        self.correct += correct
+        self.infra_failures += infra_failures
+        self.no_answer += no_answer
+    
+    def to_metrics(self) -> Dict[str, Any]:
+        """Metrics dict as reported by ReportGenerator.calculate_metrics"""
+        if self.total == 0:
+            return {
+                "total": 0,
+                "acertos": 0,
+                "erros": 0,
+                "acuracia": 0.0,
+                "sem_resposta": 0,
+                "falhas_infra": 0
+            }
+        
+        scored = self.total - self.infra_failures
+        return {
+            "total": self.total,
+            "acertos": self.correct,
+            "erros": scored - self.correct,
+            "acuracia": self.correct / scored if scored > 0 else 0.0,
+            "sem_resposta": self.no_answer,
+            "falhas_infra": self.infra_failures,
+            "por_arquivo": self._group_metrics(self.by_file),
+            "por_titulo": self._group_metrics(self.by_title)
+        }
+    
+    @staticmethod
+    def _group_metrics(counts: Dict[str, List[int]]) -> Dict[str, Dict[str, Any]]:
+        """Turn [total, correct] counters into per-group metrics"""
+        return {
+            key: {"total": total, "correct": correct, "accuracy": correct / total if total > 0 else 0}
+            for key, (total, correct) in counts.items()
+        }
+
+
+class ReportGenerator:
+    """
+    Generates evaluation reports and saves results
+    
+    Used as a context manager, the CSV is opened on entry and every result
+    added is written to it immediately. With keep_results=False only running
+    counters are kept, so memory stays constant; the summary still works but
+    the detailed and HTML reports need the results. With compact_csv=True both
+    the streamed and the saved CSV only carry COMPACT_FIELDNAMES.
+    """
+    
+    FIELDNAMES = (
+        "arquivo", "titulo", "idx_local", "pergunta",
+        "esperado", "pred", "correta", "resposta_bruta"
+    )
+    
+    # Columns written when compact_csv is set
+    COMPACT_FIELDNAMES = ("arquivo", "titulo", "idx_local", "correta")
+    
+    # Number of streamed rows between explicit flushes
+    FLUSH_EVERY = 50
+    
+    # Characters of formatted rows buffered by save_csv between writes
+    WRITE_CHUNK_SIZE = 64 * 1024
+    
+    # File buffer for the save_* writers, so large reports take few write() syscalls
+    WRITE_BUFFER_SIZE = 1 << 20
+    
+    def __init__(self, output_path: str = "resultados_avaliacao.csv", keep_results: bool = True,
+                 compact_csv: bool = False):
+        self.output_path = output_path
+        self.keep_results = keep_results
+        self.compact_csv = compact_csv
+        self.results: List[EvaluationResult] = []
+        self._counter = MetricsCounter()
+        # Metrics of the current results; reset whenever results are added
+        self._metrics_cache: Optional[Dict[str, Any]] = None
+        self._csv_file = None
+        self._csv_writer = None
+        self._csv_rows = 0
+        # One timestamp shared by the summary and every report of this run
+        self._created_at = datetime.now()
+    
+    def __enter__(self):
+        self.open_csv()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_csv()
+    
+    def add_result(self, result: EvaluationResult):
+        """Add a single evaluation result, writing it out if the CSV is open"""
+        self._metrics_cache = None
+        if self._csv_writer is not None:
+            self.write_csv_row(result)
+        if self.keep_results:
+            self.results.append(result)
+        else:
+            self._counter.update((result,))
+    
+    def add_results(self, results: List[EvaluationResult]):
+        """Add multiple evaluation results"""
+        if self._csv_writer is None and self.keep_results:
+            self._metrics_cache = None
+            self.results.extend(results)
+            return
+        for result in results:
+            self.add_result(result)
+    
+    def calculate_metrics(self) -> Dict[str, Any]:
+        """
+        Calculate evaluation metrics
+        
+        The result is cached until the next add_result/add_results, so the
+        summary and the reports share one computation; add results through
+        those methods rather than changing self.results directly.
+        """
+        if self._metrics_cache is None:
+            if self.keep_results:
+                counter = MetricsCounter()
+                counter.update(self.results)
+            else:
+                counter = self._counter
+            self._metrics_cache = counter.to_metrics()
+        return self._metrics_cache
+    
+    def save_csv(self, compact: Optional[bool] = None):
+        """
+        Save results to CSV file
+        
+        Args:
+            compact: Write only arquivo, titulo, idx_local and correta, leaving out
+                     the free-text columns that make up most of the file;
+                     defaults to the generator's compact_csv setting
+        """
+        if compact is None:
+            compact = self.compact_csv
+        if not self.results:
+            print("Nenhum resultado para salvar")
+            return
+        
+        # Rows are formatted by hand (same quoting as the csv module) and
+        # written in ~64 KB chunks instead of one writerow call per row
+        quote = _csv_quote
+        if compact:
+            fieldnames = self.COMPACT_FIELDNAMES
+            lines = (
+                f"{quote(r.arquivo)},{quote(r.titulo)},{r.idx_local},{'1' if r.correta else '0'}\r\n"
+                for r in self.results
+            )
+        else:
+            fieldnames = self.FIELDNAMES
+            lines = (
+                ",".join((
+                    quote(r.arquivo),
+                    quote(r.titulo),
+                    str(r.idx_local),
+                    quote(r.pergunta.replace("\n", " ").strip()),
+                    quote(r.esperado),
+                    quote(r.pred or ""),
+                    "1" if r.correta else "0",
+                    quote((r.resposta_bruta or "").replace("\n", "\\n"))
+                )) + "\r\n"
+                for r in self.results
+            )
+        
+        chunk = [",".join(fieldnames) + "\r\n"]
+        chunk_size = 0
+        with open(self.output_path, "w", encoding="utf-8", newline="", buffering=self.WRITE_BUFFER_SIZE) as f:
+            for line in lines:
+                chunk.append(line)
+                chunk_size += len(line)
+                if chunk_size >= self.WRITE_CHUNK_SIZE:
+                    f.write("".join(chunk))
+                    chunk.clear()
+                    chunk_size = 0
+            f.write("".join(chunk))
+        
+        print(f"CSV salvo em: {os.path.abspath(self.output_path)}")
+    
+    def _arrow_table(self):
+        """Build a typed Arrow table from the results, one column at a time"""
+        # pyarrow is optional and slow to import, so it is only loaded here
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Please install pyarrow for Parquet/Feather output: pip install pyarrow")
+        
+        results = self.results
+        return pa.table({
+            "arquivo": pa.array([r.arquivo for r in results], pa.string()),
+            "titulo": pa.array([r.titulo for r in results], pa.string()),
+            "idx_local": pa.array([r.idx_local for r in results], pa.int32()),
+            "pergunta": pa.array([r.pergunta for r in results], pa.string()),
+            "esperado": pa.array([r.esperado for r in results], pa.string()),
+            "pred": pa.array([r.pred for r in results], pa.string()),
+            "correta": pa.array([r.correta for r in results], pa.bool_()),
+            "resposta_bruta": pa.array([r.resposta_bruta for r in results], pa.string()),
+            "falha_infra": pa.array([r.falha_infra for r in results], pa.bool_()),
+        })
+    
+    def save_parquet(self, path: str = ""):
+        """Save results to a zstd-compressed Parquet file"""
+        if not path:
+            path = os.path.splitext(self.output_path)[0] + ".parquet"
+        
+        table = self._arrow_table()
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression="zstd")
+        
+        print(f"Parquet salvo em: {os.path.abspath(path)}")
+    
+    def save_feather(self, path: str = ""):
+        """Save results to a zstd-compressed Feather (Arrow IPC) file"""
+        if not path:
+            path = os.path.splitext(self.output_path)[0] + ".feather"
+        
+        table = self._arrow_table()
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression="zstd")
+        
+        print(f"Feather salvo em: {os.path.abspath(path)}")
+    
+    def open_csv(self):
+        """Open the CSV file and write the header so rows can be streamed as they complete"""
+        # Imported on use: save_csv formats rows itself, only streaming needs csv
+        import csv
+        
+        self._csv_file = open(self.output_path, "w", encoding="utf-8", newline="")
+        self._csv_writer = csv.writer(self._csv_file)
+        self._csv_writer.writerow(self.COMPACT_FIELDNAMES if self.compact_csv else self.FIELDNAMES)
+        self._csv_file.flush()
+        self._csv_rows = 0
+    
+    def write_csv_row(self, result: EvaluationResult):
+        """Append a single result to the CSV opened with open_csv"""
+        if self.compact_csv:
+            self._csv_writer.writerow((result.arquivo, result.titulo, result.idx_local, "1" if result.correta else "0"))
+        else:
+            self._csv_writer.writerow(result.to_tuple())
+        self._csv_rows += 1
+        if self._csv_rows % self.FLUSH_EVERY == 0:
+            self._csv_file.flush()
+    
+    def close_csv(self):
+        """Close the streamed CSV file, keeping whatever rows were written"""
+        if self._csv_file is None:
+            return
+        
+        self._csv_file.close()
+        self._csv_file = None
+        self._csv_writer = None
+        print(f"CSV salvo em: {os.path.abspath(self.output_path)} ({self._csv_rows} linhas)")
+    
+    def print_summary(self, model_name: str = ""):
+        """Print evaluation summary"""
+        metrics = self.calculate_metrics()
+        
+        print("\n" + "=" * 50)
+        print(" " * 15 + "RESUMO DA AVALIAÇÃO")
+        print("=" * 50)
+        
+        if model_name:
+            print(f"Modelo:           {model_name}")
+        print(f"Data:             {self._created_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"Total perguntas:  {metrics['total']}")
+        print(f"Acertos:          {metrics['acertos']}")
+        print(f"Erros:            {metrics['erros']}")
+        print(f"Acurácia:         {metrics['acuracia']:.4f}")
+        print(f"Sem resposta:     {metrics['sem_resposta']}")
+        print(f"Falhas de infra:  {metrics['falhas_infra']}")
+        
+        if metrics.get('por_arquivo'):
+            print("\n" + "-" * 50)
+            print("Acurácia por arquivo:")
+            for arquivo, stats in metrics['por_arquivo'].items():
+                print(f"  {arquivo}: {stats['accuracy']:.4f} ({stats['correct']}/{stats['total']})")
+        
+        print("=" * 50)
+    
+    def save_detailed_report(self, path: str = "", compress: bool = False):
+        """Save detailed JSON report, gzip-compressed to path + ".gz" if compress is set"""
+        if not path:
+            path = self.output_path.replace('.csv', '_detailed.json')
+        if compress:
+            path += ".gz"
+        
+        metrics = self.calculate_metrics()
+        
+        # Written record by record so the whole report is never held as one
+        # document; the layout matches an indented dump of the full report
+        with self._open_report(path, "wb", compress) as f:
+            f.write(b'{\n  "timestamp": ' + dumps(self._created_at))
+            f.write(b',\n  "metrics": ' + dumps(metrics, indent=True).replace(b"\n", b"\n  "))
+            f.write(b',\n  "results": [')
+            separator = b"\n    "
+            for result in self.results:
+                f.write(separator + dumps(result, indent=True).replace(b"\n", b"\n    "))
+                separator = b",\n    "
+            f.write(b"\n  ]\n}" if self.results else b"]\n}")
+        
+        print(f"Relatório detalhado salvo em: {os.path.abspath(path)}")
+    
+    def save_html_report(self, path: str = "", model_name: str = "", compress: bool = False):
+        """Save HTML report, gzip-compressed to path + ".gz" if compress is set"""
+        if not path:
+            path = self.output_path.replace('.csv', '_report.html')
+        if compress:
+            path += ".gz"
+        
+        metrics = self.calculate_metrics()
+        
+        with self._open_report(path, "w", compress) as f:
+            f.writelines(self._iter_html_report(metrics, model_name))
+        
+        print(f"Relatório HTML salvo em: {os.path.abspath(path)}")
+    
+    def _open_report(self, path: str, mode: str, compress: bool):
+        """Open a report file for writing, through gzip when compress is set"""
+        encoding = None if "b" in mode else "utf-8"
+        if not compress:
+            return open(path, mode, encoding=encoding, buffering=self.WRITE_BUFFER_SIZE)
+        
+        # Level 1 already shrinks these text reports severalfold at little CPU cost
+        import gzip
+        if "b" not in mode:
+            mode += "t"
+        return gzip.open(path, mode, compresslevel=1, encoding=encoding)
+    
+    def _iter_html_report(self, metrics: Dict[str, Any], model_name: str = "") -> Iterator[str]:
+        """Generate HTML report content piece by piece"""
+        # Imported on use, like the other output-specific modules
+        from html import escape
+        
+        timestamp = self._created_at.strftime('%Y-%m-%d %H:%M:%S')
+        
+        yield """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Relatório de Avaliação - HealthBench BR</title>
+    <style>
+"""
+        yield _HTML_CSS
+        yield f"""    </style>
 </head>
 <body>
     <div class="header">
@@ -407,15 +657,16 @@ class ReportGenerator:
             <div class="accuracy-fill" style="width: {metrics['acuracia']*100:.1f}%"></div>
         </div>
         
-        <p><strong>Modelo:</strong> {model_name if model_name else 'N/A'}</p>
+        <p><strong>Modelo:</strong> {escape(model_name) if model_name else 'N/A'}</p>
         <p><strong>Data da Avaliação:</strong> {timestamp}</p>
         <p><strong>Respostas sem conteúdo:</strong> {metrics['sem_resposta']}</p>
+        <p><strong>Falhas de infraestrutura (fora da acurácia):</strong> {metrics['falhas_infra']}</p>
     </div>
 """
         
         # Add breakdown by file if available
         if metrics.get('por_arquivo'):
-            html += """
+            yield """
     <div class="breakdown">
         <h2>Desempenho por Arquivo</h2>
         <table class="breakdown-table">
@@ -430,15 +681,15 @@ class ReportGenerator:
             <tbody>
 """
             for arquivo, stats in metrics['por_arquivo'].items():
-                html += f"""
+                yield f"""
                 <tr>
-                    <td>{arquivo}</td>
+                    <td>{escape(arquivo)}</td>
                     <td>{stats['total']}</td>
                     <td>{stats['correct']}</td>
                     <td>{stats['accuracy']:.2%}</td>
                 </tr>
 """
-            html += """
+            yield """
             </tbody>
         </table>
     </div>
@@ -446,7 +697,7 @@ class ReportGenerator:
         
         # Add breakdown by title if available
         if metrics.get('por_titulo'):
-            html += """
+            yield """
     <div class="breakdown">
         <h2>Desempenho por Categoria</h2>
         <table class="breakdown-table">
@@ -461,57 +712,55 @@ class ReportGenerator:
             <tbody>
 """
             for titulo, stats in metrics['por_titulo'].items():
-                html += f"""
+                yield f"""
                 <tr>
-                    <td>{titulo}</td>
+                    <td>{escape(titulo)}</td>
                     <td>{stats['total']}</td>
                     <td>{stats['correct']}</td>
                     <td>{stats['accuracy']:.2%}</td>
                 </tr>
 """
-            html += """
+            yield """
             </tbody>
         </table>
     </div>
 """
         
         # Add detailed results (show first 10 for performance)
-        html += """
+        yield """
     <div class="results">
         <h2>Resultados Detalhados (Primeiros 10)</h2>
 """
         
-        for i, result in enumerate(self.results[:10]):
+        for i, result in enumerate(islice(self.results, 10)):
             status_class = "status-correct" if result.correta else "status-incorrect"
             status_text = "Correto" if result.correta else "Incorreto"
             
-            html += f"""
+            yield f"""
         <div class="result-item">
             <div class="result-header">
-                <div class="result-title">{result.titulo} - Item {result.idx_local}</div>
+                <div class="result-title">{escape(result.titulo)} - Item {result.idx_local}</div>
                 <div class="result-status {status_class}">{status_text}</div>
             </div>
             <div class="result-content">
                 <div class="result-label">Pergunta:</div>
-                <div class="result-text">{result.pergunta}</div>
+                <div class="result-text">{escape(result.pergunta)}</div>
                 
                 <div class="result-label">Resposta Esperada:</div>
-                <div class="result-text">{result.esperado}</div>
+                <div class="result-text">{escape(result.esperado)}</div>
                 
                 <div class="result-label">Resposta do Modelo:</div>
-                <div class="result-text">{result.pred or 'Sem resposta'}</div>
+                <div class="result-text">{escape(result.pred) if result.pred else 'Sem resposta'}</div>
             </div>
         </div>
 """
         
         if len(self.results) > 10:
-            html += f"""
+            yield f"""
         <p><em>Mostrando 10 de {len(self.results)} resultados. Para ver todos os resultados, consulte o arquivo CSV gerado.</em></p>
 """
         
-        html += """
+        yield """
     </div>
 </body>
-</html>"""
-        
-        return html
\ No newline at end of file
+</html>"""
\ No newline at end of file
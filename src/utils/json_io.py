@@ -0,0 +1,64 @@
+"""JSON helpers that use orjson when it is installed"""
+
+import json
+from dataclasses import fields, is_dataclass
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; the stdlib parser produces the same objects
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file in one go"""
+    # Reading the whole file as bytes lets orjson parse from a single buffer
+    return loads(Path(path).read_bytes())
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    """Field names of a dataclass, resolved once per class"""
+    return tuple(f.name for f in fields(cls))
+
+
+def _default(obj: Any) -> Any:
+    """Serialize dataclasses and dates the way orjson does natively"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        # Shallow getattr dict: slotted dataclasses have no __dict__, and
+        # asdict would deep-copy every field
+        return {name: getattr(obj, name) for name in _field_names(type(obj))}
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes; dump_json writes exactly this to disk"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None, default=_default).encode("utf-8")
+
+
+def dump_json(obj: Any, path: Union[str, Path], indent: bool = True):
+    """
+    Serialize obj to a UTF-8 JSON file (non-ASCII characters kept as-is)
+    
+    Dataclass instances and datetimes may be passed as-is; orjson serializes
+    them natively and the stdlib fallback converts them the same way.
+    """
+    Path(path).write_bytes(dumps(obj, indent))